@@ -1,115 +1,537 @@
 #!/usr/bin/env python3
-import yt_dlp
 import os
+import mmap
 import sys
 import shlex
 import re
+import json
+import time
+import functools
+import threading
 import traceback
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType, ModuleType
+
+
+# yt-dlp's download archive, one "<extractor> <id>" entry per line
+ARCHIVE_FILE = "downloaded.txt"
+
+# Sidecar of "<pattern>\t<id>" lines for titles that failed --match-title
+REJECTED_FILE = "rejected.txt"
+
+# Per-video metadata cache, one <id>.json per rejected video
+METADATA_CACHE_DIR = ".yt-cache"
+METADATA_CACHE_FIELDS = ("id", "title", "duration", "webpage_url")
+METADATA_TTL = 30 * 24 * 3600  # seconds; --refresh-metadata prunes anything older
+
+# download archive entries buffered between fdatasync calls; playlists of
+# known size below ARCHIVE_BATCH_MIN_PLAYLIST are synced after every entry
+ARCHIVE_FLUSH_EVERY = 16
+ARCHIVE_BATCH_MIN_PLAYLIST = 32
+
+# Upper bound on URLs downloaded concurrently
+MAX_WORKERS = 8
+
+# YouTube Shorts live under /shorts/ rather than /watch
+_SHORTS_RE = re.compile(r"/shorts/")
+
+# Set on Ctrl-C so download workers stop at their next progress update
+_STOP = threading.Event()
+
+# Archive IDs claimed by running YoutubeDL instances, so a video reachable
+# from two url: lines is only downloaded by one worker; _CLAIMS_DONE holds
+# the claimed IDs that have been recorded in the archive
+_CLAIMS: dict[str, object] = {}
+_CLAIMS_DONE: set[str] = set()
+_CLAIMS_CV = threading.Condition()
+
+# Pattern pieces that match differently under re.ASCII: \w-style classes;
+# i, k and s, which IGNORECASE also folds with U+0130/U+0131, U+212A and
+# U+017F; ranges and character escapes that could cover those; and inline
+# (?u) flags, which re.ASCII rejects
+_UNICODE_SENSITIVE_RE = re.compile(r"\\[wWbBdDsSxuUN0-9]|[iksIKS]|[^\\]-[^\]]|\(\?[aiLmsux-]*u")
+
+# Compiled title regexes, keyed by (pattern, flags), reused across build_opts calls
+_REGEX_CACHE: dict[tuple[str, int], re.Pattern] = {}
 
 
 # ---------- helpers ----------------------------------------------------------
 
+def compile_cached(pattern, flags=0):
+    """Compile a regex once and reuse it on subsequent calls."""
+    key = (pattern, flags)
+    regex = _REGEX_CACHE.get(key)
+    if regex is None:
+        regex = _REGEX_CACHE[key] = re.compile(pattern, flags)
+    return regex
+
+
+def title_regex_flags(pattern):
+    """Case-insensitive flags for pattern, adding re.ASCII where it is safe.
+
+    re.ASCII is only added to ASCII-only patterns without \\w-style classes,
+    i, k or s, ranges, character escapes or (?u); those match the same
+    titles either way and skip Unicode case folding.
+    """
+    if pattern.isascii() and not _UNICODE_SENSITIVE_RE.search(pattern):
+        return re.IGNORECASE | re.ASCII
+    return re.IGNORECASE
+
+
 def read_archive_file(filename="archiveme.txt"):
-    """Read archiveme.txt for URL and optional CLI-style args."""
+    """Read archiveme.txt into a list of (url, extra_args) pairs.
+
+    addtl_args lines before the first url: line apply to every URL; ones
+    after a url: line apply to that URL only.
+    """
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        with open(filename, "rb") as f:
+            data = f.read().decode("utf-8")
     except FileNotFoundError:
         raise FileNotFoundError(f"Missing required file: {filename}")
 
-    url, extra_args = None, []
-    for line in lines:
-        if line.lower().startswith("url:"):
-            url = line.split(":", 1)[1].strip()
-        elif line.lower().startswith("addtl_args:"):
-            extra_args.extend(shlex.split(line.split(":", 1)[1].strip()))
+    config = {"shared_args": [], "jobs": []}
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        handler = _ARCHIVE_KEYS.get(key.lower()) if sep else None
+        if handler:
+            handler(config, value.strip())
 
-    if not url:
+    if not config["jobs"]:
         raise ValueError(f"{filename} must contain a 'url:' line.")
-    return url, extra_args
+    return [(url, config["shared_args"] + args) for url, args in config["jobs"]]
+
+
+def _set_url(config, value):
+    if not value:
+        raise ValueError("'url:' line has no URL.")
+    config["jobs"].append((value, []))
+
+
+def _extend_args(config, value):
+    target = config["jobs"][-1][1] if config["jobs"] else config["shared_args"]
+    target.extend(shlex.split(value))
+
+
+# archiveme.txt line prefix -> handler(config, value)
+_ARCHIVE_KEYS = {
+    "url": _set_url,
+    "addtl_args": _extend_args,
+}
+
 
+def read_rejected_ids(filename, pattern):
+    """Return the IDs filename lists as rejected by pattern, read via mmap.
+
+    Each line is "<pattern>\t<id>", so an ID rejected by one URL's
+    --match-title isn't skipped for a URL with a different pattern.
+    """
+    try:
+        fd = os.open(filename, os.O_RDONLY)
+    except FileNotFoundError:
+        return set()
+    try:
+        if os.fstat(fd).st_size == 0:
+            return set()
+        with mmap.mmap(fd, 0, prot=mmap.PROT_READ) as mm:
+            lines = iter(mm.readline, b"")
+            entries = (line.rstrip(b"\r\n").decode("utf-8").rpartition("\t") for line in lines)
+            return {video_id for pat, sep, video_id in entries if sep and pat == pattern}
+    finally:
+        os.close(fd)
 
-def make_combined_filter(title_regex=None):
-    """Return a callable that skips Shorts and non-matching titles."""
-    regex = re.compile(title_regex, re.IGNORECASE) if title_regex else None
 
-    def _filter(info):
-        # Block obvious YouTube Shorts
-        if info.get("duration") and info["duration"] < 60:
-            return "short video (<60s)"
-        if "/shorts/" in info.get("webpage_url", ""):
-            return "YouTube Shorts URL"
-        # Apply match-title regex if given
-        if regex and not regex.search(info.get("title", "")):
+def make_combined_filter(title_regex=None, rejected_file=REJECTED_FILE):
+    """Return a callable that skips Shorts and non-matching titles.
+
+    IDs whose titles fail title_regex are appended to rejected_file and
+    skipped outright on later runs with the same title_regex.
+    """
+    regex = compile_cached(title_regex, title_regex_flags(title_regex)) if title_regex else None
+    rejected_ids = read_rejected_ids(rejected_file, title_regex) if regex else set()
+    rejected_log = None
+    shorts_search = _SHORTS_RE.search
+    title_search = regex.search if regex else None
+
+    def _record_rejected(video_id):
+        nonlocal rejected_log
+        if not video_id or video_id in rejected_ids:
+            return
+        if rejected_log is None:
+            rejected_log = open(rejected_file, "a", encoding="utf-8", buffering=1)
+        rejected_log.write(f"{title_regex}\t{video_id}\n")
+        rejected_ids.add(video_id)
+
+    def _filter(info, *, incomplete=False):
+        # yt-dlp calls this with incomplete=True on flat playlist entries
+        # before extracting them, so reject what we can from those alone.
+        get = info.get
+        if rejected_ids and get("id") in rejected_ids:
+            return "previously rejected"
+        # Block obvious YouTube Shorts (<60s or a /shorts/ URL)
+        if (get("duration") or 9999) < 60 or shorts_search(get("webpage_url") or get("url") or ""):
+            return "YouTube Short"
+        # Apply match-title regex if given; defer flat entries without a title
+        title = get("title")
+        if title is None and incomplete:
+            return None
+        if title_search and not title_search(title or ""):
+            _record_rejected(get("id"))
             return f"title doesn't match {regex.pattern}"
         return None
     return _filter
 
 
+def metadata_cache_path(video_id):
+    return os.path.join(METADATA_CACHE_DIR, f"{video_id}.json")
+
+
+def load_cached_metadata(video_id):
+    """Return the cached info dict for video_id, or None if not cached."""
+    try:
+        with open(metadata_cache_path(video_id), "rb") as f:
+            return json.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_cached_metadata(info):
+    """Atomically write info to the metadata cache."""
+    os.makedirs(METADATA_CACHE_DIR, exist_ok=True)
+    path = metadata_cache_path(info["id"])
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp, path)
+
+
+def prune_metadata_cache(max_age=METADATA_TTL):
+    """Delete cached metadata older than max_age seconds."""
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(METADATA_CACHE_DIR))
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for entry in entries:
+        if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+class _InterruptibleTime(ModuleType):
+    """Stand-in for the time module whose sleep() wakes up on _STOP."""
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        _STOP.wait(seconds)
+        _raise_if_stopped()
+
+
+def _raise_if_stopped(status=None):
+    """Abort the calling yt-dlp worker once _STOP is set."""
+    if _STOP.is_set():
+        from yt_dlp.utils import DownloadCancelled
+        raise DownloadCancelled("Interrupted by user")
+
+
+class StopMixin:
+    """YoutubeDL mixin that aborts once _STOP is set (Ctrl-C in main()).
+
+    _STOP is checked at every progress update and before each result is
+    processed.  archiver_ydl_class() also makes yt-dlp's pre-download
+    sleep wake up on it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.add_progress_hook(_raise_if_stopped)
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        _raise_if_stopped()
+        return super().process_ie_result(ie_result, download, extra_info)
+
+
+class ClaimMixin:
+    """YoutubeDL mixin that shares video IDs between parallel workers.
+
+    A video's archive ID is claimed in _CLAIMS once this instance's own
+    filters have accepted it, so a video reachable from two url: lines is
+    only downloaded by one worker.  Another worker reaching it waits for
+    the claim: if the video ends up in the archive it is skipped, and if
+    the claim is released (rejected later or failed) it tries itself.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._claim_token = object()
+        self._held_claims = set()
+
+    def _match_entry(self, info_dict, incomplete=False, silent=False):
+        reason = super()._match_entry(info_dict, incomplete, silent)
+        if reason is None and info_dict.get("_type", "video") == "video" and not self.claim(info_dict):
+            reason = f"{info_dict.get('id')}: already downloaded from another URL"
+            if not silent:
+                self.to_screen(f"[download] {reason}")
+        return reason
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        try:
+            return super().process_ie_result(ie_result, download, extra_info)
+        finally:
+            self.release_claims()
+
+    def record_download_archive(self, info_dict):
+        super().record_download_archive(info_dict)
+        archive_id = self._make_archive_id(info_dict)
+        with _CLAIMS_CV:
+            _CLAIMS_DONE.add(archive_id)
+            self._held_claims.discard(archive_id)
+            _CLAIMS_CV.notify_all()
+
+    def claim(self, info):
+        """Reserve info's archive ID for this instance.
+
+        Waits while another instance holds it; returns False if that
+        instance recorded it in the archive.
+        """
+        archive_id = self._make_archive_id(info)
+        if not archive_id:
+            return True
+        with _CLAIMS_CV:
+            while True:
+                owner = _CLAIMS.setdefault(archive_id, self._claim_token)
+                if owner is self._claim_token:
+                    if archive_id not in _CLAIMS_DONE:
+                        self._held_claims.add(archive_id)
+                    return True
+                if archive_id in _CLAIMS_DONE:
+                    return False
+                _CLAIMS_CV.wait(1)
+                _raise_if_stopped()
+
+    def release_claims(self):
+        """Give up claims on videos this instance didn't archive."""
+        if not self._held_claims:
+            return
+        with _CLAIMS_CV:
+            for archive_id in self._held_claims:
+                if _CLAIMS.get(archive_id) is self._claim_token:
+                    del _CLAIMS[archive_id]
+            self._held_claims.clear()
+            _CLAIMS_CV.notify_all()
+
+
+class ArchiveBatchMixin:
+    """YoutubeDL mixin that batches download archive appends.
+
+    Entries are appended with a single write + fdatasync every
+    ARCHIVE_FLUSH_EVERY videos, instead of yt-dlp reopening and locking
+    the file for each one.
+    """
+
+    _archive_pending = None
+
+    def record_download_archive(self, info_dict):
+        fn = self.params.get("download_archive")
+        if not isinstance(fn, (str, os.PathLike)):
+            return super().record_download_archive(info_dict)
+        vid_id = self._make_archive_id(info_dict)
+        self.write_debug(f"Adding to archive: {vid_id}")
+        self.archive.add(vid_id)
+        if self._archive_pending is None:
+            self._archive_pending = []
+            atexit.register(self.flush_download_archive)
+        self._archive_pending.append(vid_id)
+
+        # lazy_playlist leaves the size unknown (None) for channel tabs; batch those
+        playlist_size = info_dict.get("n_entries") or info_dict.get("playlist_count")
+        if ((playlist_size and playlist_size < ARCHIVE_BATCH_MIN_PLAYLIST)
+                or len(self._archive_pending) >= ARCHIVE_FLUSH_EVERY):
+            self.flush_download_archive()
+
+    def flush_download_archive(self):
+        """Append buffered archive entries and sync them to disk."""
+        if not self._archive_pending:
+            return
+        data = "".join(f"{v}\n" for v in self._archive_pending).encode("utf-8")
+        self._archive_pending.clear()
+        fd = os.open(self.params["download_archive"],
+                     os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fdatasync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        self.flush_download_archive()
+        atexit.unregister(self.flush_download_archive)
+        super().close()
+
+
+class MetadataCacheMixin:
+    """YoutubeDL mixin that remembers rejected videos between runs.
+
+    Only videos the match filter rejects after full extraction are cached,
+    and only the fields the filter reads.  On later runs those videos are
+    skipped without fetching their watch page.
+    """
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        result_type = ie_result.get("_type", "video")
+        video_id = ie_result.get("id")
+        if result_type in ("url", "url_transparent") and video_id:
+            cached = load_cached_metadata(video_id)
+            match_filter = self.params.get("match_filter")
+            if cached and match_filter:
+                reason = match_filter(cached)
+                if reason:
+                    self.to_screen(f"[cache] {video_id}: {reason}, skipping")
+                    return None
+        return super().process_ie_result(ie_result, download, extra_info)
+
+    def _match_entry(self, info_dict, incomplete=False, silent=False):
+        reason = super()._match_entry(info_dict, incomplete, silent)
+        # incomplete is True only for flat entries; full videos get a field set
+        video_id = info_dict.get("id")
+        if reason is not None and incomplete is not True and video_id \
+                and info_dict.get("_type", "video") == "video":
+            try:
+                save_cached_metadata({k: info_dict.get(k) for k in METADATA_CACHE_FIELDS})
+            except (OSError, TypeError, ValueError) as e:
+                self.report_warning(f"Could not cache metadata for {video_id}: {e}")
+        return reason
+
+
+@functools.cache
+def archiver_ydl_class():
+    """Return the YoutubeDL subclass main() downloads with (imports yt_dlp).
+
+    StopMixin makes Ctrl-C stop parallel workers, ClaimMixin keeps them
+    from downloading the same video twice, MetadataCacheMixin skips
+    videos rejected on earlier runs and ArchiveBatchMixin batches
+    downloaded.txt writes.
+    """
+    import yt_dlp
+    import yt_dlp.downloader.common
+    # FileDownloader.download sleeps with a plain time.sleep; swap in one
+    # Ctrl-C can cut short, leaving yt-dlp's own sleep rules untouched
+    yt_dlp.downloader.common.time = _InterruptibleTime("time")
+    return type("ArchiverYoutubeDL",
+                (StopMixin, ClaimMixin, MetadataCacheMixin, ArchiveBatchMixin, yt_dlp.YoutubeDL),
+                {})
+
+
+def _set_title_pattern(opts, value):
+    opts["_title_pattern"] = value
+
+
+def _set_reject_title(opts, value):
+    opts["reject_title"] = value
+
+
+def _set_audio_format(opts, value):
+    opts["postprocessors"][0]["preferredcodec"] = value
+
+
+def _set_sleep_interval(opts, value):
+    opts["min_sleep_interval"] = opts["max_sleep_interval"] = int(value)
+
+
+def _no_continue(opts, value):
+    opts["continuedl"] = False
+
+
+def _no_overwrites(opts, value):
+    opts["nooverwrites"] = False
+
+
+def _refresh_metadata(opts, value):
+    # Popped in main(), which prunes once for all URLs
+    opts["_refresh_metadata"] = True
+
+
+# flag -> (takes a value, handler(opts, value))
+HANDLERS = {
+    "--match-title": (True, _set_title_pattern),
+    "--reject-title": (True, _set_reject_title),
+    "--audio-format": (True, _set_audio_format),
+    "--sleep-interval": (True, _set_sleep_interval),
+    "--no-continue": (False, _no_continue),
+    "--no-overwrites": (False, _no_overwrites),
+    "--refresh-metadata": (False, _refresh_metadata),
+}
+
+
 def apply_manual_args(opts, args):
     """Merge a small whitelist of CLI flags into opts."""
-    i = 0
-    title_pattern = None
-    while i < len(args):
-        arg = args[i]
-        nxt = args[i + 1] if i + 1 < len(args) else None
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        takes_val, handler = HANDLERS.get(arg, (False, None))
+        if handler is None:
+            print(f"⚠️  Ignoring unsupported argument '{arg}'")
+            continue
+        value = None
+        if takes_val:
+            if not args:
+                print(f"⚠️  Ignoring '{arg}': missing value")
+                break
+            value = args.pop(0)
         try:
-            if arg == "--match-title" and nxt:
-                title_pattern = nxt
-                i += 1
-            elif arg == "--reject-title" and nxt:
-                opts["reject_title"] = nxt
-                i += 1
-            elif arg == "--audio-format" and nxt:
-                opts["postprocessors"][0]["preferredcodec"] = nxt
-                i += 1
-            elif arg == "--sleep-interval" and nxt:
-                val = int(nxt)
-                opts["min_sleep_interval"] = opts["max_sleep_interval"] = val
-                i += 1
-            elif arg == "--no-continue":
-                opts["continuedl"] = False
-            elif arg == "--no-overwrites":
-                opts["nooverwrites"] = False
+            handler(opts, value)
         except Exception as e:
             print(f"⚠️  Ignoring malformed argument '{arg}': {e}")
-        i += 1
 
     # Always rebuild the combined filter (handles Shorts + optional title)
-    opts["match_filter"] = make_combined_filter(title_pattern)
+    opts["match_filter"] = make_combined_filter(opts.pop("_title_pattern", None))
     return opts
 
 
-def build_opts(extra_args, debug=False):
-    """Compose yt-dlp options with defaults and safe overrides."""
-    opts = {
-        "format": "bestaudio/best",
-        "min_sleep_interval": 10,
-        "max_sleep_interval": 60,
-        "nooverwrites": True,
-        "continuedl": True,
-        "download_archive": "downloaded.txt",
-        "cookiefile": "youtube.com_cookies.txt",
-        "outtmpl": "%(title)s [%(id)s].%(ext)s",
-        "prefer_ffmpeg": True,
-        "match_filter": make_combined_filter(None),
-        "postprocessors": [{
+# Defaults shared by every build_opts call; copied before any override
+_DEFAULT_OPTS = MappingProxyType({
+    "format": "bestaudio/best",
+    "min_sleep_interval": 10,
+    "max_sleep_interval": 60,
+    "nooverwrites": True,
+    "continuedl": True,
+    "download_archive": ARCHIVE_FILE,
+    "cookiefile": "youtube.com_cookies.txt",
+    "outtmpl": "%(title)s [%(id)s].%(ext)s",
+    "prefer_ffmpeg": True,
+    "lazy_playlist": True,
+    "postprocessors": (
+        MappingProxyType({
             "key": "FFmpegExtractAudio",
             "preferredcodec": "flac",
             "preferredquality": "0",
             "when": "post_process",
-        },
-         # Step 2 – add tags from yt-dlp metadata
-       {
-           "key": "FFmpegMetadata",
-           "add_metadata": True,
-           "when": "post_process",
-       },
-  ],
-    }
-
-    if extra_args:
-        opts = apply_manual_args(opts, extra_args)
+        }),
+        # Step 2 – add tags from yt-dlp metadata
+        MappingProxyType({
+            "key": "FFmpegMetadata",
+            "add_metadata": True,
+            "when": "post_process",
+        }),
+    ),
+})
+
+
+def build_opts(extra_args, debug=False):
+    """Compose yt-dlp options with defaults and safe overrides."""
+    opts = dict(_DEFAULT_OPTS)
+    opts["postprocessors"] = [dict(p) for p in _DEFAULT_OPTS["postprocessors"]]
+
+    opts = apply_manual_args(opts, extra_args or [])
 
     if debug:
         opts["verbose"] = True
@@ -119,32 +541,121 @@ def build_opts(extra_args, debug=False):
 
 # ---------- main -------------------------------------------------------------
 
+def prefetch_yt_dlp():
+    """Start importing yt_dlp on a daemon thread.
+
+    Returns a function that waits for the import and re-raises its error.
+    Call it on the main thread before anything else imports yt_dlp:
+    concurrent imports of its submodules see them half-initialized.
+    """
+    errors = []
+
+    def _import():
+        try:
+            import yt_dlp  # noqa: F401
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=_import, daemon=True)
+    thread.start()
+
+    def wait():
+        thread.join()
+        if errors:
+            raise errors[0]
+    return wait
+
+
+def download_url(url, opts):
+    """Download one URL; return an error message, or None on success."""
+    from yt_dlp.utils import DownloadError
+    try:
+        with archiver_ydl_class()(opts) as ydl:
+            ydl.download([url])
+    except DownloadError as e:
+        return str(e)
+    return None
+
+
+def download_parallel(jobs):
+    """Run download_url for each (url, opts) job on a thread pool.
+
+    Returns one result per job: None, a DownloadError message, or the
+    exception the job raised.  On Ctrl-C (or anything else escaping)
+    the remaining workers are stopped.
+    """
+    ex = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs)))
+    futures = [ex.submit(download_url, url, opts) for url, opts in jobs]
+    try:
+        results = []
+        for f in futures:
+            try:
+                results.append(f.result())
+            except Exception as e:
+                results.append(e)
+    except BaseException:
+        # Cancelling only drops queued jobs; running ones stop at their
+        # next progress update or playlist entry once _STOP is set.
+        _STOP.set()
+        ex.shutdown(wait=False, cancel_futures=True)
+        raise
+    ex.shutdown()
+    return results
+
+
 def main():
     debug = "--debug" in sys.argv
     sys.argv = [a for a in sys.argv if a != "--debug"]
 
     try:
-        url, extra_args = read_archive_file()
-        opts = build_opts(extra_args, debug=debug)
+        # Load yt_dlp's extractor registry in the background while the
+        # config is read; a daemon thread, so config errors exit at once.
+        wait_for_yt_dlp = prefetch_yt_dlp()
+        entries = read_archive_file()
+        wait_for_yt_dlp()
 
-        print(f"▶️  Downloading from: {url}")
-        if extra_args:
-            print(f"   Extra args: {' '.join(extra_args)}")
+        jobs = []
+        refresh_metadata = False
+        for url, extra_args in entries:
+            opts = build_opts(extra_args, debug=debug)
+            refresh_metadata |= opts.pop("_refresh_metadata", False)
+            jobs.append((url, opts))
 
-        if debug:
-            print("----- DEBUG INFO -----")
-            for k, v in opts.items():
-                if callable(v):
-                    print(f"{k}: <callable>")
-                else:
-                    print(f"{k}: {v}")
-            print("----------------------")
+            print(f"▶️  Downloading from: {url}")
+            if extra_args:
+                print(f"   Extra args: {' '.join(extra_args)}")
 
-        try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                ydl.download([url])
-        except yt_dlp.utils.DownloadError as e:
-            print(f"❌ yt-dlp download error: {e}")
+            if debug:
+                lines = (f"{k}: {'<callable>' if callable(v) else v}" for k, v in opts.items())
+                sys.stdout.write("----- DEBUG INFO -----\n"
+                                 + "\n".join(lines)
+                                 + "\n----------------------\n")
+
+        if refresh_metadata:
+            removed = prune_metadata_cache()
+            print(f"🧹 Removed {removed} stale metadata cache entries")
+
+        # A single URL stays on the main thread so Ctrl-C interrupts it
+        # directly. Workers share downloaded.txt; each flush is one
+        # O_APPEND write, so their batches don't interleave.
+        if len(jobs) == 1:
+            errors = [download_url(*jobs[0])]
+        else:
+            errors = download_parallel(jobs)
+
+        failed = [(url, err) for (url, _), err in zip(jobs, errors) if err]
+        crashed = False
+        for url, err in failed:
+            if isinstance(err, Exception):
+                crashed = True
+                print(f"💥 Unexpected error for {url}: {type(err).__name__}: {err}")
+                if debug:
+                    traceback.print_exception(err)
+            else:
+                print(f"❌ yt-dlp download error for {url}: {err}")
+        if crashed:
+            sys.exit(99)
+        if failed:
             sys.exit(2)
 
         print("✅ Download complete.")
@@ -156,9 +667,12 @@ def main():
     except KeyboardInterrupt:
         print("\n⏹ Interrupted by user.")
         sys.exit(130)
-    except Exception:
-        print("💥 Unexpected error:")
-        traceback.print_exc()
+    except Exception as e:
+        if debug:
+            print("💥 Unexpected error:")
+            traceback.print_exc()
+        else:
+            print(f"💥 Unexpected error: {type(e).__name__}: {e} (rerun with --debug for a traceback)")
         sys.exit(99)
 
 